@@ -1,6 +1,14 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+
+from services.validators import validate_url
 
 
 class WebsiteAnalysisRequest(BaseModel):
     url: str
-    analysis_type: str
\ No newline at end of file
+    analysis_type: str
+
+    @field_validator('url')
+    @classmethod
+    def normalize_url(cls, url: str) -> str:
+        """Reject invalid URLs while the request body is parsed"""
+        return validate_url(url)
\ No newline at end of file
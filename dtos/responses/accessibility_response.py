@@ -1,9 +1,13 @@
 from typing import List, Dict, Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+
+ISSUE_LIST_FIELDS = ('image_issues', 'heading_issues', 'form_issues', 'contrast_issues', 'aria_issues')
 
 
 class Issue(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     element: str
     issue: str
     src: str | None = None
@@ -14,6 +18,8 @@ class Issue(BaseModel):
     missing_attributes: List[str] | None = None
 
 class AccessibilityAnalysisResult(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     url: str
     image_issues: List[Issue]
     heading_issues: List[Issue]
@@ -25,4 +31,14 @@ class AccessibilityAnalysisResult(BaseModel):
 
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> 'AccessibilityAnalysisResult':
-        return AccessibilityAnalysisResult(**data)
+        # Built from our own analyzer output, so skip validation; FastAPI still checks the response model
+        issues = {
+            key: [Issue.model_construct(**issue) for issue in data[key]]
+            for key in ISSUE_LIST_FIELDS
+        }
+        return AccessibilityAnalysisResult.model_construct(
+            url=data['url'],
+            total_issues=data['total_issues'],
+            error=data.get('error'),
+            **issues
+        )
@@ -1,12 +1,16 @@
 from typing import Dict
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class MetricResult(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     value: float
     rating: str
     unit: str
 
 class WebVitalsResult(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     TTFB: MetricResult
     FCP: MetricResult
     LCP: MetricResult
@@ -15,4 +19,7 @@ class WebVitalsResult(BaseModel):
 
     @staticmethod
     def from_dict(data: Dict[str, Dict[str, float | str]]) -> 'WebVitalsResult':
-        return WebVitalsResult(**data)
\ No newline at end of file
+        # Built from our own analyzer output, so skip validation; FastAPI still checks the response model
+        return WebVitalsResult.model_construct(
+            **{metric: MetricResult.model_construct(**result) for metric, result in data.items()}
+        )
\ No newline at end of file
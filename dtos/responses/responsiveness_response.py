@@ -1,29 +1,53 @@
-from typing import Dict, Any
-from pydantic import BaseModel
+from typing import Any, Dict, List
+from pydantic import BaseModel, ConfigDict
 
 class ViewportTestResult(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
+    name: str
     has_horizontal_scroll: bool
     elements_overflow: bool
 
 class ResourceLoadingResult(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
+    name: str
     duration: float
     size: int
 
 class InteractiveElementResult(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
+    name: str
     visible: bool
     clickable: bool
 
 class Results(BaseModel):
-    viewport_tests: Dict[str, ViewportTestResult]
-    resource_loading: Dict[str, ResourceLoadingResult]
-    interactive_elements: Dict[str, InteractiveElementResult]
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
+    viewport_tests: List[ViewportTestResult]
+    resource_loading: List[ResourceLoadingResult]
+    interactive_elements: List[InteractiveElementResult]
     load_time: float
 
 class WebpageResponsivenessReport(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     url: str
     timestamp: str
     results: Results
 
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> 'WebpageResponsivenessReport':
-        return WebpageResponsivenessReport(**data)
\ No newline at end of file
+        # Built from our own analyzer output, so skip validation; FastAPI still checks the response model
+        results = data['results']
+        return WebpageResponsivenessReport.model_construct(
+            url=data['url'],
+            timestamp=data['timestamp'],
+            results=Results.model_construct(
+                viewport_tests=[ViewportTestResult.model_construct(**result) for result in results['viewport_tests']],
+                resource_loading=[ResourceLoadingResult.model_construct(**result) for result in results['resource_loading']],
+                interactive_elements=[InteractiveElementResult.model_construct(**result) for result in results['interactive_elements']],
+                load_time=results['load_time'],
+            ),
+        )
\ No newline at end of file
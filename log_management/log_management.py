@@ -1,10 +1,43 @@
-import glob
 import gzip
-import json
-import logging
+import heapq
 import os
+import re
 import shutil
-from datetime import datetime, timedelta
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager, suppress
+from operator import itemgetter
+
+import orjson
+
+from log_management.logging_config import get_logger
+
+# zlib level 6 is the usual speed/ratio sweet spot; 9 costs far more CPU for little gain
+GZIP_COMPRESS_LEVEL = 6
+COPY_BUFFER_SIZE = 256 * 1024
+READ_BUFFER_SIZE = 1 << 20
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# Aggregates used to be written as .json before they became NDJSON; both are cleaned up
+AGGREGATE_SUFFIXES = ('.ndjson', '.json')
+
+TIMESTAMP_PATTERN = re.compile(r'"timestamp":\s*"([^"]*)"')
+
+@contextmanager
+def _atomic_output(filename: str):
+    """
+    Open a temporary binary file that replaces filename only once it has been fully written
+    """
+    tmp_filename = f'{filename}.tmp'
+    try:
+        with open(tmp_filename, 'wb', buffering=READ_BUFFER_SIZE) as f:
+            yield f
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(tmp_filename)
+        raise
 
 
 class LogManagement:
@@ -13,37 +46,55 @@ class LogManagement:
         self.compress_older_than = compress_older_than
         self.aggregation_days = aggregation_days
 
+    @property
+    def logger(self):
+        return get_logger('log_management')
+
     def fetch_log_files(self):
-        """Fetch log files from the log directory"""
-        log_files = []
-        for log_file in glob.glob(f"{self.log_dir}/*"):
-            log_files.append(log_file)
-        return log_files
+        """Fetch log files from the log directory as cached-stat DirEntry objects"""
+        with os.scandir(self.log_dir) as entries:
+            yield from entries
 
     def compress_old_logs(self):
         """Compress log files older than specified days"""
-        cutoff_date = datetime.now() - timedelta(days=self.compress_older_than)
+        cutoff_ts = time.time() - self.compress_older_than * SECONDS_PER_DAY
 
-        for log_file in self.fetch_log_files():
+        eligible = []
+        for entry in self.fetch_log_files():
             # Skip if already compressed
-            if log_file.endswith('.gz'):
+            if entry.name.endswith('.gz'):
                 continue
 
             try:
-                file_mtime = datetime.fromtimestamp(os.path.getmtime(log_file))
+                if entry.stat().st_mtime < cutoff_ts:
+                    eligible.append(entry.path)
+            except Exception as e:
+                self.logger.error(f"Error compressing {entry.path}: {e}")
 
-                if file_mtime < cutoff_date:
-                    # Compress the file
-                    with open(log_file, 'rb') as f_in:
-                        with gzip.open(f'{log_file}.gz', 'wb') as f_out:
-                            shutil.copyfileobj(f_in, f_out)
+        if not eligible:
+            return
 
-                    # Remove the original file
-                    os.remove(log_file)
-                    logging.getLogger('log_management').info(f"Compressed: {log_file}")
+        # zlib releases the GIL while deflating, so threads compress files in parallel
+        max_workers = min(len(eligible), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            compressed = [log_file for log_file in executor.map(self._compress_one, eligible) if log_file]
 
-            except Exception as e:
-                logging.getLogger('log_management').error(f"Error compressing {log_file}: {e}")
+        # Remove the originals in one pass once every file has been compressed
+        self.remove_original_files(compressed)
+
+    def _compress_one(self, log_file: str):
+        """Compress a single log file, returning its path on success"""
+        try:
+            with open(log_file, 'rb', buffering=READ_BUFFER_SIZE) as f_in:
+                with gzip.open(f'{log_file}.gz', 'wb', compresslevel=GZIP_COMPRESS_LEVEL) as f_out:
+                    shutil.copyfileobj(f_in, f_out, length=COPY_BUFFER_SIZE)
+
+            self.logger.info(f"Compressed: {log_file}")
+            return log_file
+
+        except Exception as e:
+            self.logger.error(f"Error compressing {log_file}: {e}")
+            return None
 
     def aggregate_logs(self):
         """
@@ -57,97 +108,150 @@ class LogManagement:
         Group logs by date
         """
         log_groups = {}
-        for log_file in self.fetch_log_files():
+        cutoff_ts = time.time() - self.aggregation_days * SECONDS_PER_DAY
+        # scandir order tends to cluster files by day, so remember the last day's key
+        last_day, date_key = None, None
+        for entry in self.fetch_log_files():
+            log_file = entry.path
             try:
-                if log_file.endswith('.gz'):
+                if entry.name.endswith('.gz') or entry.name.startswith('aggregate_'):
                     continue
 
-                file_mtime = datetime.fromtimestamp(os.path.getmtime(log_file))
-                if datetime.now() - file_mtime > timedelta(days=self.aggregation_days):
-                    date_key = file_mtime.strftime("%Y-%m-%d")
+                mtime = entry.stat().st_mtime
+                if mtime < cutoff_ts:
+                    # Bucket by UTC day to match the UTC timestamps inside the log records
+                    day = int(mtime // SECONDS_PER_DAY)
+                    if day != last_day:
+                        last_day, date_key = day, time.strftime("%Y-%m-%d", time.gmtime(mtime))
                     if date_key not in log_groups:
                         log_groups[date_key] = []
                     log_groups[date_key].append(log_file)
             except Exception as e:
-                logging.getLogger('log_management').error(f"Error processing {log_file}: {e}")
+                self.logger.error(f"Error processing {log_file}: {e}")
         return log_groups
 
     def aggregate_and_remove_logs(self, log_groups):
         """
         Aggregate logs by date and remove original files
         """
-        for date, files in log_groups.items():
-            try:
-                aggregate_filename = os.path.join(self.log_dir, f"aggregate_{date}.json")
-                aggregated_logs = self.combine_logs(files)
-                self.write_aggregated_logs(aggregate_filename, aggregated_logs)
-                self.remove_original_files(files)
-                logging.getLogger('log_management').info(f"Aggregated logs for {date}")
-            except Exception as e:
-                logging.getLogger('log_management').error(f"Error aggregating logs for {date}: {e}")
+        if not log_groups:
+            return
+
+        # Each day writes its own aggregate, so days are merged in parallel to overlap their disk I/O
+        max_workers = min(len(log_groups), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            aggregated_files = [
+                log_file
+                for files in executor.map(self._aggregate_one, log_groups.keys(), log_groups.values())
+                for log_file in files
+            ]
+
+        # Remove the originals in one pass once every aggregate has been written
+        self.remove_original_files(aggregated_files)
+
+    def _aggregate_one(self, date: str, files):
+        """Write the aggregate for a single day, returning the files it covered on success"""
+        try:
+            aggregate_filename = os.path.join(self.log_dir, f"aggregate_{date}.ndjson")
+            # Single files go through combine_logs too, so blank and non-JSON lines are dropped either way
+            aggregated_logs = self.combine_logs(files)
+            self.write_aggregated_logs(aggregate_filename, aggregated_logs)
+            self.logger.info(f"Aggregated logs for {date}")
+            return files
+        except Exception as e:
+            self.logger.error(f"Error aggregating logs for {date}: {e}")
+            return []
 
     def combine_logs(self, files):
         """
-        Combine logs from multiple files
+        Merge logs from multiple files into a single timestamp-ordered stream of raw lines.
+
+        Each file is written chronologically, so the per-file streams are already sorted
+        and can be merged lazily without holding every entry in memory.
         """
-        aggregated_logs = []
-        for file in files:
-            with open(file, 'r') as f:
-                for line in f:
-                    try:
-                        log_entry = json.loads(line.strip())
-                        aggregated_logs.append(log_entry)
-                    except json.JSONDecodeError:
-                        pass
-        aggregated_logs.sort(key=lambda x: x.get('timestamp', ''))
-        return aggregated_logs
+        with ExitStack() as stack:
+            streams = [self._iter_timestamped_lines(stack.enter_context(open(file, 'r'))) for file in files]
+            # A lone file is already in timestamp order and needs no merge
+            merged = streams[0] if len(streams) == 1 else heapq.merge(*streams, key=itemgetter(0))
+            for _, line in merged:
+                yield line
 
-    def write_aggregated_logs(self, filename, logs):
+    @staticmethod
+    def _iter_timestamped_lines(f):
         """
-        Write aggregated logs to a file
+        Yield (timestamp, line) pairs for every JSON log line in a file
         """
-        with open(filename, 'w') as f:
-            json.dump(logs, f, indent=2)
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+
+            match = TIMESTAMP_PATTERN.search(line)
+            if match:
+                yield match.group(1), line
+                continue
+
+            # Fall back to a full parse for lines that don't carry a plain timestamp field
+            try:
+                log_entry = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+            if isinstance(log_entry, dict):
+                yield str(log_entry.get('timestamp', '')), line
+
+    def write_aggregated_logs(self, filename, lines):
+        """
+        Write aggregated log lines to a newline-delimited JSON file
+        """
+        with _atomic_output(filename) as f:
+            for line in lines:
+                f.write(line.encode('utf-8'))
+                f.write(b'\n')
 
     def remove_original_files(self, files):
         """
         Remove original log files
         """
         for file in files:
-            os.remove(file)
+            try:
+                os.remove(file)
+            except OSError as e:
+                self.logger.error(f"Error removing {file}: {e}")
 
     def cleanup_aggregate_logs(self, older_than_days: int):
         """
         Cleanup aggregate logs older than specified days
         """
-        cutoff_date = datetime.now() - timedelta(days=older_than_days)
+        cutoff_ts = time.time() - older_than_days * SECONDS_PER_DAY
 
-        for log_file in glob.glob(f"{self.log_dir}/aggregate_*.json"):
-            try:
-                file_mtime = datetime.fromtimestamp(os.path.getmtime(log_file))
+        for entry in self.fetch_log_files():
+            if not (entry.name.startswith('aggregate_') and entry.name.endswith(AGGREGATE_SUFFIXES)):
+                continue
 
-                if file_mtime < cutoff_date:
+            log_file = entry.path
+            try:
+                if entry.stat().st_mtime < cutoff_ts:
                     os.remove(log_file)
-                    logging.getLogger('log_management').info(f"Removed: {log_file}")
+                    self.logger.info(f"Removed: {log_file}")
 
             except Exception as e:
-                logging.getLogger('log_management').error(f"Error removing {log_file}: {e}")
+                self.logger.error(f"Error removing {log_file}: {e}")
 
     def cleanup_compressed_logs(self, older_than_days: int):
         """
         Cleanup compressed logs older than specified days
         """
-        cutoff_date = datetime.now() - timedelta(days=older_than_days)
+        cutoff_ts = time.time() - older_than_days * SECONDS_PER_DAY
 
-        for log_file in glob.glob(f"{self.log_dir}/*.gz"):
-            try:
-                file_mtime = datetime.fromtimestamp(os.path.getmtime(log_file))
+        for entry in self.fetch_log_files():
+            if not entry.name.endswith('.gz'):
+                continue
 
-                if file_mtime < cutoff_date:
+            log_file = entry.path
+            try:
+                if entry.stat().st_mtime < cutoff_ts:
                     os.remove(log_file)
-                    logging.getLogger('log_management').info(f"Removed: {log_file}")
+                    self.logger.info(f"Removed: {log_file}")
 
             except Exception as e:
-                logging.getLogger('log_management').error(f"Error removing {log_file}: {e}")
-
-    logger = logging.getLogger('log_management')
+                self.logger.error(f"Error removing {log_file}: {e}")
@@ -1,24 +1,38 @@
-import json
+import atexit
 import logging
 import os
+import queue
+import re
+import threading
 import traceback
 from datetime import datetime, timezone
 from logging import Logger
-from logging.handlers import RotatingFileHandler
-from typing import Any, Dict, Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, List, Optional
 
+import orjson
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request as StarletteRequest
 
 from config import settings
 
+# Standard LogRecord attributes that should not be copied into the JSON payload
+RESERVED_RECORD_ATTRS = frozenset({
+    'args', 'asctime', 'created', 'exc_info', 'exc_text',
+    'filename', 'funcName', 'levelname', 'levelno', 'lineno',
+    'module', 'msecs', 'msg', 'name', 'pathname', 'process',
+    'processName', 'relativeCreated', 'stack_info', 'thread',
+    'threadName', 'extra',
+})
+
 
 class JsonFormatter(logging.Formatter):
     """Enhanced JSON formatter with additional context and sanitization"""
 
-    SENSITIVE_FIELDS = {'password', 'token', 'authorization', 'api_key', 'secret',
-                        'credential', 'credit_card', 'ssn'}
+    SENSITIVE_FIELDS = ('password', 'token', 'authorization', 'api_key', 'secret',
+                        'credential', 'credit_card', 'ssn')
+    SENSITIVE_PATTERN = re.compile('|'.join(map(re.escape, SENSITIVE_FIELDS)))
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -29,9 +43,7 @@ class JsonFormatter(logging.Formatter):
 
     def sanitize_value(self, key: str, value: Any) -> Any:
         """Remove sensitive information from log data"""
-        if any(sensitive in str(key).lower() for sensitive in self.SENSITIVE_FIELDS):
-            return '[REDACTED]'
-        return value
+        return '[REDACTED]' if self.SENSITIVE_PATTERN.search(key.lower()) else value
 
     def get_request_context(self, request: Optional[StarletteRequest] = None) -> Dict[str, Any]:
         """Extract useful information from the current request"""
@@ -53,7 +65,7 @@ class JsonFormatter(logging.Formatter):
 
         # Add basic log information
         log_record.update({
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
@@ -77,14 +89,10 @@ class JsonFormatter(logging.Formatter):
 
         # Add any extra attributes that were passed in LogRecord
         for key, value in record.__dict__.items():
-            if key not in ['args', 'asctime', 'created', 'exc_info', 'exc_text',
-                           'filename', 'funcName', 'levelname', 'levelno', 'lineno',
-                           'module', 'msecs', 'msg', 'name', 'pathname', 'process',
-                           'processName', 'relativeCreated', 'stack_info', 'thread',
-                           'threadName', 'extra']:
+            if key not in RESERVED_RECORD_ATTRS:
                 log_record[key] = self.sanitize_value(key, value)
 
-        return json.dumps(log_record, default=str)
+        return orjson.dumps(log_record, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
 
 
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
@@ -92,14 +100,18 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
 
     async def dispatch(self, request: Request, call_next):
         # Create a logger for request logging
-        request_logger = logging.getLogger('request_logger')
+        request_logger = get_logger('request_logger')
+        client_ip = request.client.host if request.client else None
+        headers = request.headers
 
         # Log request details before processing
         request_logger.info('Incoming Request', extra={
             'method': request.method,
             'path': request.url.path,
-            'headers': dict(request.headers),
-            'client_ip': request.client.host
+            'user_agent': headers.get('user-agent'),
+            'x_request_id': headers.get('x-request-id'),
+            'referer': headers.get('referer'),
+            'client_ip': client_ip
         })
 
         # Process the request
@@ -110,12 +122,49 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             'method': request.method,
             'path': request.url.path,
             'status_code': response.status_code,
-            'client_ip': request.client.host
+            'client_ip': client_ip
         })
 
         return response
 
 
+class InProcessQueueHandler(QueueHandler):
+    """Queue handler that hands records to the listener untouched"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so there is no need to pre-format the
+        # record and strip exc_info; JsonFormatter needs both to build the payload.
+        return record
+
+
+_queue_listeners: Dict[str, QueueListener] = {}
+
+
+def attach_queue_handler(logger: Logger, handlers: List[logging.Handler]) -> None:
+    """
+    Route a logger's records through a queue so handlers write on a background thread
+
+    Args:
+        logger: Logger to attach the queue handler to
+        handlers: Handlers that should receive the records from the listener thread
+    """
+    previous_listener = _queue_listeners.pop(logger.name, None)
+    if previous_listener:
+        # QueueListener.stop is not idempotent before Python 3.12, so drop its exit hook too
+        atexit.unregister(previous_listener.stop)
+        previous_listener.stop()
+        for handler in previous_listener.handlers:
+            handler.close()
+
+    log_queue = queue.Queue(-1)
+    logger.handlers = [InProcessQueueHandler(log_queue)]
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    _queue_listeners[logger.name] = listener
+
+
 def setup_logger(
         name: str,
         log_file: str,
@@ -143,7 +192,6 @@ def setup_logger(
     logger.handlers = []
 
     # File handler with rotation
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
     file_handler = RotatingFileHandler(
         log_file,
         maxBytes=max_bytes,
@@ -151,13 +199,15 @@ def setup_logger(
         encoding='utf-8'
     )
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    handlers = [file_handler]
 
     # Optional console handler
     if add_console or os.getenv('FASTAPI_ENV') == 'development':
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    attach_queue_handler(logger, handlers)
 
     return logger
 
@@ -167,52 +217,64 @@ ENV = settings.ENVIRONMENT
 LOG_LEVEL = logging.DEBUG if ENV == 'development' else logging.INFO
 CONSOLE_OUTPUT = ENV == 'development'
 
-# Create loggers with enhanced configuration
-loggers = {
-    'main': setup_logger(
-        'main_logger',
-        'logs/main.log',
-        level=LOG_LEVEL,
-        add_console=CONSOLE_OUTPUT
-    ),
-    'db': setup_logger(
-        'db_logger',
-        'logs/db.log',
-        level=LOG_LEVEL
-    ),
-    'email': setup_logger(
-        'email_logger',
-        'logs/emails.log',
-        level=LOG_LEVEL
-    ),
-    'request': setup_logger(
-        'request_logger',
-        'logs/requests.log',
-        level=LOG_LEVEL
-    ),
-'log_management': setup_logger(
-        'log_management',
-        'logs/log_management.log',
-        level=LOG_LEVEL
-    ),
-'performance': setup_logger(
-        'performance_logger',
-        'logs/performance.log',
-        level=LOG_LEVEL
-    ),
-'responsiveness': setup_logger(
-        'responsiveness_logger',
-        'logs/responsiveness.log',
-        level=LOG_LEVEL
-    ),
-'accessibility': setup_logger(
-        'accessibility_logger',
-        'logs/accessibility.log',
-        level=LOG_LEVEL
-    ),
+# Directory shared by all log files, created once at import
+LOG_DIR = 'logs'
+os.makedirs(LOG_DIR, exist_ok=True)
+
+# Log file for each named logger; handlers are only created when a logger is first requested
+LOG_FILES = {
+    'main_logger': 'main.log',
+    'db_logger': 'db.log',
+    'email_logger': 'emails.log',
+    'request_logger': 'requests.log',
+    'log_management': 'log_management.log',
+    'performance_logger': 'performance.log',
+    'responsiveness_logger': 'responsiveness.log',
+    'accessibility_logger': 'accessibility.log',
 }
 
 
+_loggers: Dict[str, Logger] = {}
+_logger_lock = threading.Lock()
+
+
+def get_logger(name: str) -> Logger:
+    """Configure the named logger on first use and return it"""
+    logger = _loggers.get(name)
+    if logger is None:
+        # Worker threads can ask for the same logger at once; only one of them may set it up
+        with _logger_lock:
+            logger = _loggers.get(name)
+            if logger is None:
+                logger = _loggers[name] = setup_logger(
+                    name,
+                    os.path.join(LOG_DIR, LOG_FILES[name]),
+                    level=LOG_LEVEL,
+                    add_console=CONSOLE_OUTPUT and name == 'main_logger'
+                )
+    return logger
+
+
+def _restart_queue_listeners() -> None:
+    """
+    Give a forked child (e.g. a Celery prefork worker) its own listener threads.
+
+    Threads don't survive fork, so loggers configured in the parent would queue records nobody
+    writes. The parent's listeners are abandoned rather than stopped, since their queue locks may
+    have been held at fork time.
+    """
+    global _logger_lock
+    _logger_lock = threading.Lock()
+    for name, listener in list(_queue_listeners.items()):
+        atexit.unregister(listener.stop)
+        del _queue_listeners[name]
+        attach_queue_handler(logging.getLogger(name), list(listener.handlers))
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_queue_listeners)
+
+
 # Helper function to log with extra context
 def log_with_context(logger: Logger, level: str, message: str, **extra):
     """Helper function to log with extra context"""
@@ -220,15 +282,23 @@ def log_with_context(logger: Logger, level: str, message: str, **extra):
     log_method(message, extra=extra)
 
 
-# Export individual loggers for backward compatibility
-main_logger = loggers['main']
-db_logger = loggers['db']
-email_logger = loggers['email']
-request_logger = loggers['request']
-log_management_logger = loggers['log_management']
-accessibility_logger = loggers['accessibility']
-responsiveness_logger = loggers['responsiveness']
-performance_logger = loggers['performance']
+# Export individual loggers for backward compatibility, configured lazily on first access
+_LOGGER_ALIASES = {
+    'main_logger': 'main_logger',
+    'db_logger': 'db_logger',
+    'email_logger': 'email_logger',
+    'request_logger': 'request_logger',
+    'log_management_logger': 'log_management',
+    'accessibility_logger': 'accessibility_logger',
+    'responsiveness_logger': 'responsiveness_logger',
+    'performance_logger': 'performance_logger',
+}
+
+
+def __getattr__(name: str) -> Logger:
+    if name in _LOGGER_ALIASES:
+        return get_logger(_LOGGER_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Example usage in a FastAPI app
 from fastapi import FastAPI
@@ -253,10 +323,12 @@ def setup_logging(app: FastAPI):
         encoding='utf-8'
     )
     file_handler.setFormatter(JsonFormatter())
-    uvicorn_logger.addHandler(file_handler)
+    handlers = [file_handler]
 
     # Add console handler if in development
     if CONSOLE_OUTPUT:
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(JsonFormatter())
-        uvicorn_logger.addHandler(console_handler)
\ No newline at end of file
+        handlers.append(console_handler)
+
+    attach_queue_handler(uvicorn_logger, handlers)
\ No newline at end of file
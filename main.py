@@ -8,7 +8,6 @@ from dtos.responses.responsiveness_response import WebpageResponsivenessReport
 from log_management.logging_config import setup_logging, main_logger
 from services.performance_analyzer import WebPageAnalyzer
 from services.responsiveness_analyzer import WebpageResponsivenessAnalyzer
-from services.validators import validate_url
 from services.web_accessibility_analyzer import WebAccessibilityAnalyzer
 
 app = FastAPI(
@@ -59,22 +58,16 @@ async def analyze_website(request: WebsiteAnalysisRequest):
     Returns:
         PerformanceReport: Comprehensive performance analysis results
     """
-    print(f"Analyzing website: {request.url}")
-    # Validate URL
-    try:
-        validated_url = validate_url(request.url)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
+    main_logger.debug("Analyzing website: %s", request.url)
     # Perform crawl and analysis
     try:
         performance_analyzer = WebPageAnalyzer()
 
-        performance_report = performance_analyzer.analyze(validated_url)
+        performance_report = performance_analyzer.analyze(request.url)
 
         return performance_report
     except Exception as e:
-        print(e)
+        main_logger.error(e)
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
@@ -89,20 +82,13 @@ async def analyze_responsiveness(request: WebsiteAnalysisRequest):
     Returns:
         dict: Mobile friendliness analysis results
     """
-    print(f"Analyzing mobile friendliness: {request.url}")
-    # Validate URL
-    try:
-        validated_url = validate_url(request.url)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
+    main_logger.debug("Analyzing mobile friendliness: %s", request.url)
     # Perform mobile friendliness analysis
     try:
         # Initialize mobile friendliness analyzer
-        mobile_analyzer = WebpageResponsivenessAnalyzer(url=validated_url)
+        mobile_analyzer = WebpageResponsivenessAnalyzer(url=request.url)
         mobile_friendly_results = mobile_analyzer.run_full_analysis()
-        print("mobile_friendly_results")
-        print(mobile_friendly_results)
+        main_logger.debug("mobile_friendly_results=%r", mobile_friendly_results)
 
         return mobile_friendly_results
     except Exception as e:
@@ -121,23 +107,16 @@ async def analyze_accessibility(request: WebsiteAnalysisRequest):
     Returns:
         AccessibilityAnalysisResult: Comprehensive accessibility analysis results
     """
-    print(f"Analyzing accessibility: {request.url}")
-    # Validate URL
-    try:
-        validated_url = validate_url(request.url)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
+    main_logger.debug("Analyzing accessibility: %s", request.url)
     # Perform accessibility analysis
     try:
         # Initialize mobile friendliness analyzer
-        accessibility_analyzer = WebAccessibilityAnalyzer(url=validated_url)
+        accessibility_analyzer = WebAccessibilityAnalyzer(url=request.url)
         accessibility_results = accessibility_analyzer.analyze()
 
-        print("accessibility_results")
-        print(accessibility_results)
+        main_logger.debug("accessibility_results=%r", accessibility_results)
 
         return accessibility_results
     except Exception as e:
-        print(e)
+        main_logger.error(e)
         raise HTTPException(status_code=500, detail=f"Accessibility analysis failed: {str(e)}")
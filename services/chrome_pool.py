@@ -0,0 +1,115 @@
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+
+# Upper bound on Chrome processes alive at once, shared by every analyzer
+MAX_BROWSERS = 4
+
+DEFAULT_WINDOW_SIZE = (1920, 1080)
+
+
+class ChromePool:
+    """
+    Keeps headless Chrome sessions alive between analyses so each request skips the browser launch.
+
+    A WebDriver session only has one current window, so sessions are lent out whole rather than
+    per tab; the semaphore caps how many Chrome processes can exist at once.
+    """
+
+    def __init__(self, max_size: int = MAX_BROWSERS):
+        self.options = webdriver.ChromeOptions()
+        self.options.add_argument('--headless')
+        self.options.add_argument('--disable-gpu')
+        # Launch at the size _reset restores, so fresh and reused sessions render identically
+        self.options.add_argument('--window-size=%d,%d' % DEFAULT_WINDOW_SIZE)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.Semaphore(max_size)
+
+    def acquire(self):
+        """Borrow a Chrome session, launching one if none are idle or alive"""
+        self._slots.acquire()
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._is_alive(driver):
+                return driver
+            self._quit(driver)
+
+        try:
+            return webdriver.Chrome(options=self.options)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver, discard: bool = False):
+        """
+        Return a borrowed session to the pool
+
+        Args:
+            driver: Session previously handed out by acquire
+            discard: Quit the session instead of reusing it, e.g. after a failed analysis
+        """
+        try:
+            if not discard and self._reset(driver):
+                self._idle.put(driver)
+            else:
+                self._quit(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self):
+        """Borrow a session for the duration of a with block, discarding it if the block fails"""
+        driver = self.acquire()
+        try:
+            yield driver
+        except BaseException:
+            self.release(driver, discard=True)
+            raise
+        self.release(driver)
+
+    def shutdown(self):
+        """Quit every idle session"""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._quit(driver)
+
+    @staticmethod
+    def _reset(driver) -> bool:
+        """Bring a session back to a blank, cold-cache state so runs don't influence each other"""
+        try:
+            driver.get('about:blank')
+            driver.set_window_size(*DEFAULT_WINDOW_SIZE)
+            driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _is_alive(driver) -> bool:
+        """Check that an idle session's browser still answers, e.g. it wasn't killed while idle"""
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+chrome_pool = ChromePool()
+atexit.register(chrome_pool.shutdown)
@@ -0,0 +1,41 @@
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds for page fetches
+REQUEST_TIMEOUT = (3, 10)
+
+
+def build_session(pool_size: int = 10, retries: int = 2) -> requests.Session:
+    """
+    Build a requests session that keeps connections alive between analyses
+
+    Args:
+        pool_size: Number of connections kept per host
+        retries: Number of times a failed request is retried
+
+    Returns:
+        requests.Session: Session with pooled, retrying adapters mounted for http and https
+    """
+    session = requests.Session()
+    # The session is shared across every analyzed site and user, so never store or send cookies
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=retries, backoff_factor=0.2) if retries else 0
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# Shared by the analyzers so warm requests skip the TCP and TLS handshakes
+SESSION = build_session()
+
+# For timed requests: a retry and its backoff would be counted as part of the measurement. The timed
+# response is closed unread, which drops its socket, so every measurement runs on a cold connection
+# (DNS, TCP and TLS included) and a single pooled connection is all this session needs.
+TIMING_SESSION = build_session(pool_size=1, retries=0)
@@ -1,10 +1,12 @@
 import time
+from bisect import bisect_right
 from urllib.parse import urlparse
 
-import requests
-from selenium import webdriver
-
 from dtos.responses.performance_response import WebVitalsResult
+from log_management.logging_config import performance_logger
+from services.chrome_pool import ChromePool, chrome_pool
+from services.http_client import REQUEST_TIMEOUT, TIMING_SESSION
+from services.result_cache import ResultCache
 
 POOR = 'Poor'
 
@@ -12,64 +14,133 @@ GOOD = 'Good'
 
 NEEDS_IMPROVEMENT = 'Needs Improvement'
 
+# Upper bounds (exclusive) of the Good and Needs Improvement bands for each metric
+RATINGS = {
+    'TTFB': ([800, 1800], [GOOD, NEEDS_IMPROVEMENT, POOR]),
+    'FCP': ([1800, 3000], [GOOD, NEEDS_IMPROVEMENT, POOR]),
+    'LCP': ([2500, 4000], [GOOD, NEEDS_IMPROVEMENT, POOR]),
+    'CLS': ([0.1, 0.25], [GOOD, NEEDS_IMPROVEMENT, POOR]),
+    'FID': ([100, 300], [GOOD, NEEDS_IMPROVEMENT, POOR]),
+}
+
+UNITS = {'CLS': 'score'}
+
+# Injected before any page script runs so every paint, layout shift and input entry is observed
+WEB_VITALS_OBSERVER_SCRIPT = """
+    window.__webVitals = {FCP: 0, LCP: 0, CLS: 0, FID: 0};
+
+    // Resolves once the page has loaded and painted its largest content, so collection needn't sit out a fixed delay
+    let loaded = false;
+    let painted = false;
+    let markReady;
+    window.__webVitalsReady = new Promise((resolve) => { markReady = resolve; });
+    const checkReady = () => {
+        if (loaded && painted) {
+            markReady();
+        }
+    };
+    window.addEventListener('load', () => {
+        loaded = true;
+        checkReady();
+    });
+
+    const observe = (type, callback) => {
+        try {
+            new PerformanceObserver((list) => list.getEntries().forEach(callback))
+                .observe({type: type, buffered: true});
+        } catch (e) {
+            // Entry type not supported by this browser
+        }
+    };
+
+    observe('paint', (entry) => {
+        if (entry.name === 'first-contentful-paint') {
+            window.__webVitals.FCP = entry.startTime;
+        }
+    });
+    observe('largest-contentful-paint', (entry) => {
+        window.__webVitals.LCP = entry.startTime;
+        painted = true;
+        checkReady();
+    });
+    observe('layout-shift', (entry) => {
+        if (!entry.hadRecentInput) {
+            window.__webVitals.CLS += entry.value;
+        }
+    });
+    observe('first-input', (entry) => {
+        if (!window.__webVitals.FID) {
+            window.__webVitals.FID = entry.processingStart - entry.startTime;
+        }
+    });
+"""
+
+# Hand back what was observed as soon as the page is ready, waiting at most 5 seconds for pages that never paint
+WEB_VITALS_COLLECT_SCRIPT = """
+    const done = arguments[arguments.length - 1];
+    let finished = false;
+    const finish = () => {
+        if (!finished) {
+            finished = true;
+            done(window.__webVitals || {});
+        }
+    };
+    setTimeout(finish, 5000);
+    // Let one more frame go by so layout shifts caused by the final paint are counted
+    (window.__webVitalsReady || Promise.resolve()).then(() => requestAnimationFrame(() => setTimeout(finish, 0)));
+"""
+
+# Recent results shared by every WebPageAnalyzer, so repeated requests for a URL skip the browser
+performance_cache = ResultCache()
+
 
 class WebPageAnalyzer:
-    def __init__(self):
+    def __init__(self, pool: ChromePool = None, cache: ResultCache = None):
         self.metrics = {}
-        self.chrome_options = webdriver.ChromeOptions()
-        self.chrome_options.add_argument('--headless')
-        self.chrome_options.add_argument('--disable-gpu')
+        self._web_vitals = None
+        self.pool = pool or chrome_pool
+        self.cache = cache or performance_cache
+        self.logger = performance_logger
 
     def measure_ttfb(self, url):
         """Measure Time to First Byte (TTFB)"""
         print(f"Measuring TTFB for {url}")
         start_time = time.time()
-        requests.get(url)
+        # stream=True returns as soon as the status line and headers arrive, without downloading the body.
+        # Closing the unread response drops the socket, so TTFB is always measured on a cold connection.
+        response = TIMING_SESSION.get(url, stream=True, timeout=REQUEST_TIMEOUT)
         ttfb = (time.time() - start_time) * 1000  # Convert to milliseconds
+        response.close()
         self.metrics['TTFB'] = round(ttfb, 2)
         print(f"TTFB: {self.metrics['TTFB']} ms")
 
+    def collect_web_vitals(self, url):
+        """Load the page once in a single Chrome session and collect FCP, LCP, CLS and FID"""
+        if self._web_vitals is not None and self._web_vitals[0] == url:
+            return self._web_vitals[1]
+
+        self.logger.debug("Collecting web vitals for %s", url)
+        with self.pool.driver() as driver:
+            # Register the observers before any page script runs so no entry is missed
+            observer = driver.execute_cdp_cmd(
+                'Page.addScriptToEvaluateOnNewDocument', {'source': WEB_VITALS_OBSERVER_SCRIPT}
+            )
+            driver.get(url)
+            vitals = driver.execute_async_script(WEB_VITALS_COLLECT_SCRIPT) or {}
+            # The session goes back to the pool, so don't leave the observers behind for the next page
+            driver.execute_cdp_cmd(
+                'Page.removeScriptToEvaluateOnNewDocument', {'identifier': observer['identifier']}
+            )
+
+        self._web_vitals = (url, vitals)
+        return vitals
+
     def measure_fcp_lcp(self, url):
         """Measure First Contentful Paint (FCP) and Largest Contentful Paint (LCP)"""
         print(f"Measuring FCP and LCP for {url}")
-        driver = webdriver.Chrome(options=self.chrome_options)
-        try:
-            driver.get(url)
-
-            # Execute JavaScript to get FCP and LCP
-            script = """
-                return new Promise((resolve) => {
-                    const observer = new PerformanceObserver((list) => {
-                        const entries = list.getEntries();
-                        const metrics = {};
-
-                        entries.forEach(entry => {
-                            if (entry.entryType === 'paint' && entry.name === 'first-contentful-paint') {
-                                metrics.FCP = entry.startTime;
-                            }
-                            if (entry.entryType === 'largest-contentful-paint') {
-                                metrics.LCP = entry.startTime;
-                            }
-                        });
-
-                        resolve(metrics);
-                    });
-
-                    observer.observe({
-                        entryTypes: ['paint', 'largest-contentful-paint']
-                    });
-
-                    // Timeout after 10 seconds
-                    setTimeout(() => resolve({}), 10000);
-                });
-            """
-
-            metrics = driver.execute_script(script)
-            self.metrics['FCP'] = round(metrics.get('FCP', 0), 2)
-            self.metrics['LCP'] = round(metrics.get('LCP', 0), 2)
-
-        finally:
-            driver.quit()
+        vitals = self.collect_web_vitals(url)
+        self.metrics['FCP'] = round(vitals.get('FCP', 0), 2)
+        self.metrics['LCP'] = round(vitals.get('LCP', 0), 2)
 
         print(f"FCP: {self.metrics['FCP']} ms")
         print(f"LCP: {self.metrics['LCP']} ms")
@@ -77,121 +148,61 @@ class WebPageAnalyzer:
     def measure_cls(self, url):
         """Measure Cumulative Layout Shift (CLS)"""
         print(f"Measuring CLS for {url}")
-        driver = webdriver.Chrome(options=self.chrome_options)
-        try:
-            driver.get(url)
-
-            script = """
-                return new Promise((resolve) => {
-                    let cls = 0;
-
-                    new PerformanceObserver((list) => {
-                        for (const entry of list.getEntries()) {
-                            if (!entry.hadRecentInput) {
-                                cls += entry.value;
-                            }
-                        }
-                    }).observe({entryTypes: ['layout-shift']});
-
-                    setTimeout(() => resolve(cls), 5000);
-                });
-            """
-
-            cls = driver.execute_script(script)
-            self.metrics['CLS'] = round(cls, 3)
-
-        finally:
-            driver.quit()
+        vitals = self.collect_web_vitals(url)
+        self.metrics['CLS'] = round(vitals.get('CLS', 0), 3)
 
         print(f"CLS: {self.metrics['CLS']}")
 
     def measure_fid(self, url):
         """Measure First Input Delay (FID)"""
         print(f"Measuring FID for {url}")
-        driver = webdriver.Chrome(options=self.chrome_options)
-        try:
-            driver.get(url)
-
-            script = """
-                return new Promise((resolve) => {
-                    new PerformanceObserver((list) => {
-                        const entries = list.getEntries();
-                        if (entries.length > 0) {
-                            resolve(entries[0].processingStart - entries[0].startTime);
-                        }
-                    }).observe({entryTypes: ['first-input']});
-
-                    setTimeout(() => resolve(0), 5000);
-                });
-            """
-
-            fid = driver.execute_script(script)
-            self.metrics['FID'] = round(fid, 2)
-
-        finally:
-            driver.quit()
+        vitals = self.collect_web_vitals(url)
+        self.metrics['FID'] = round(vitals.get('FID', 0), 2)
 
         print(f"FID: {self.metrics['FID']} ms")
 
-    def analyze(self, url: str) -> WebVitalsResult:
+    def analyze(self, url: str, force: bool = False) -> WebVitalsResult:
         """Analyze all web vitals metrics for a given URL
         :param url:
+        :param force: Re-run the analysis even if a recent result is cached
         :return: WebVitalsResult
         """
-        print(f"Analyzing site: {url}")
         if not urlparse(url).scheme:
             url = 'https://' + url
 
+        if not force:
+            cached = self.cache.get(url)
+            if cached is not None:
+                self.logger.info("Using cached analysis for: %s", url)
+                return cached
+
+        print(f"Analyzing site: {url}")
+        # A cache miss (or force) must measure from scratch, not reuse this instance's last run
+        self.metrics = {}
+        self._web_vitals = None
+
+        # TTFB is measured before Chrome loads the page so the two requests don't compete for the
+        # server and network; FCP, LCP, CLS and FID then all come from the same browser session
         self.measure_ttfb(url)
         self.measure_fcp_lcp(url)
         self.measure_cls(url)
         self.measure_fid(url)
 
-        return self.get_results()
+        results = self.get_results()
+        self.cache.set(url, results)
+        return results
 
     def get_results(self) -> WebVitalsResult:
         """Return analysis results with ratings"""
         print("Generating analysis results")
-        ratings = {
-            'TTFB': {
-                GOOD: lambda x: x < 800,
-                NEEDS_IMPROVEMENT: lambda x: x < 1800,
-                POOR: lambda x: x >= 1800
-            },
-            'FCP': {
-                GOOD: lambda x: x < 1800,
-                NEEDS_IMPROVEMENT: lambda x: x < 3000,
-                POOR: lambda x: x >= 3000
-            },
-            'LCP': {
-                GOOD: lambda x: x < 2500,
-                NEEDS_IMPROVEMENT: lambda x: x < 4000,
-                POOR: lambda x: x >= 4000
-            },
-            'CLS': {
-                GOOD: lambda x: x < 0.1,
-                NEEDS_IMPROVEMENT: lambda x: x < 0.25,
-                POOR: lambda x: x >= 0.25
-            },
-            'FID': {
-                GOOD: lambda x: x < 100,
-                NEEDS_IMPROVEMENT: lambda x: x < 300,
-                POOR: lambda x: x >= 300
-            }
-        }
-
         results = {}
         for metric, value in self.metrics.items():
-            rating = POOR
-            for rating_level, check in ratings[metric].items():
-                if check(value):
-                    rating = rating_level
-                    break
-
+            thresholds, labels = RATINGS[metric]
+            # bisect_right so a value sitting exactly on a threshold falls into the worse band
             results[metric] = {
                 'value': value,
-                'rating': rating,
-                'unit': 'ms' if metric != 'CLS' else 'score'
+                'rating': labels[bisect_right(thresholds, value)],
+                'unit': UNITS.get(metric, 'ms')
             }
 
         return WebVitalsResult.from_dict(results)
\ No newline at end of file
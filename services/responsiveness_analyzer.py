@@ -1,40 +1,70 @@
 import time
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-
 from dtos.responses.responsiveness_response import WebpageResponsivenessReport
 from log_management.logging_config import responsiveness_logger
+from services.chrome_pool import ChromePool, chrome_pool
+
+VIEWPORT_SIZES = (
+    (320, 568),  # Mobile
+    (768, 1024),  # Tablet
+    (1024, 768),  # Landscape tablet
+    (1920, 1080)  # Desktop
+)
+
+# Waits two animation frames so the resize has been laid out, then reads both layout checks in one round-trip
+VIEWPORT_CHECK_SCRIPT = """
+    const done = arguments[arguments.length - 1];
+    requestAnimationFrame(() => requestAnimationFrame(() => {
+        const root = document.documentElement;
+        const body = document.body;
+        done({
+            has_horizontal_scroll: root.scrollWidth > root.clientWidth,
+            // Content wider than the body shows up in its scrollWidth, so one layout read covers every element
+            elements_overflow: root.scrollWidth > window.innerWidth || (!!body && body.scrollWidth > body.clientWidth)
+        });
+    }));
+"""
+
+# Reads type, identifier, visibility and clickability of every interactive element in one round-trip
+INTERACTIVE_ELEMENTS_SCRIPT = """
+    return Array.from(document.querySelectorAll('button, a, input, select, textarea')).map(el => {
+        const visible = !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+        return {
+            type: el.type || el.tagName.toLowerCase(),
+            id: el.id || el.getAttribute('class'),
+            visible: visible,
+            clickable: visible && !el.disabled && getComputedStyle(el).pointerEvents !== 'none'
+        };
+    });
+"""
 
 
 class WebpageResponsivenessAnalyzer:
-    def __init__(self, url):
+    def __init__(self, url, pool: ChromePool = None):
         self.url = url
-        self.chrome_options = Options()
-        self.chrome_options.add_argument('--headless')
+        self.pool = pool or chrome_pool
         self.results = {}
         self.logger = responsiveness_logger
 
     def start_analysis(self):
         """Initialize the analysis process"""
+        driver = None
         try:
-            self.driver = webdriver.Chrome(options=self.chrome_options)
-            self.driver.get(self.url)
+            driver = self.pool.acquire()
+            driver.get(self.url)
         except Exception as e:
+            if driver is not None:
+                self.pool.release(driver, discard=True)
             self.logger.error(f"Error initializing analysis: {str(e)}")
             raise e
+        self.driver = driver
 
     def check_load_time(self):
         """Measure initial page load time"""
         try:
-            time.time()
-            self.driver.get(self.url)
-            navigation_start = self.driver.execute_script("return window.performance.timing.navigationStart")
-            response_end = self.driver.execute_script("return window.performance.timing.responseEnd")
-            page_load_time = response_end - navigation_start
+            # start_analysis already navigated to the page, so read its timings instead of loading it again
+            timing = self.driver.execute_script("return window.performance.timing.toJSON()")
+            page_load_time = timing['responseEnd'] - timing['navigationStart']
             self.results['load_time'] = page_load_time
             return page_load_time
         except Exception as e:
@@ -43,33 +73,19 @@ class WebpageResponsivenessAnalyzer:
 
     def check_viewport_sizes(self):
         """Test page rendering at different viewport sizes"""
-        viewport_sizes = [
-            (320, 568),  # Mobile
-            (768, 1024),  # Tablet
-            (1024, 768),  # Landscape tablet
-            (1920, 1080)  # Desktop
-        ]
-
-        viewport_results = {}
+        viewport_results = []
         try:
-            for width, height in viewport_sizes:
+            for width, height in VIEWPORT_SIZES:
                 self.driver.set_window_size(width, height)
-                time.sleep(1)  # Allow page to adjust
-
-                # Check for horizontal scrollbar
-                has_horizontal_scroll = self.driver.execute_script(
-                    "return document.documentElement.scrollWidth > document.documentElement.clientWidth"
-                )
 
-                # Check if elements maintain proper layout
-                elements_overflow = self.driver.execute_script(
-                    "return Array.from(document.getElementsByTagName('*')).some(el => el.offsetWidth > window.innerWidth)"
-                )
+                # Check for horizontal scrollbar and elements breaking the layout once the page has adjusted
+                layout = self.driver.execute_async_script(VIEWPORT_CHECK_SCRIPT)
 
-                viewport_results[f"{width}x{height}"] = {
-                    "has_horizontal_scroll": has_horizontal_scroll,
-                    "elements_overflow": elements_overflow
-                }
+                viewport_results.append({
+                    "name": f"{width}x{height}",
+                    "has_horizontal_scroll": layout['has_horizontal_scroll'],
+                    "elements_overflow": layout['elements_overflow']
+                })
 
             self.results['viewport_tests'] = viewport_results
             return viewport_results
@@ -84,12 +100,11 @@ class WebpageResponsivenessAnalyzer:
                 "return window.performance.getEntriesByType('resource')"
             )
 
-            resource_times = {}
-            for entry in performance_timing:
-                resource_times[entry['name']] = {
-                    'duration': entry['duration'],
-                    'size': entry['transferSize'] if 'transferSize' in entry else 0
-                }
+            resource_times = [{
+                'name': entry['name'],
+                'duration': entry['duration'],
+                'size': entry.get('transferSize', 0)
+            } for entry in performance_timing]
 
             self.results['resource_loading'] = resource_times
             return resource_times
@@ -99,33 +114,20 @@ class WebpageResponsivenessAnalyzer:
 
     def check_interactive_elements(self):
         """Test responsiveness of interactive elements"""
-        interactive_elements = self.driver.find_elements(
-            by=By.CSS_SELECTOR,
-            value='button, a, input, select, textarea'
-        )
-
-        interactive_results = {}
-        for element in interactive_elements:
-            try:
-                element_type = element.get_attribute('type') or element.tag_name
-                element_id = element.get_attribute('id') or element.get_attribute('class')
-
-                # Check if element is visible and clickable
-                is_visible = element.is_displayed()
-                is_clickable = WebDriverWait(self.driver, 1).until(
-                    EC.element_to_be_clickable(element)
-                ) is not None
-
-                interactive_results[f"{element_type}_{element_id}"] = {
-                    "visible": is_visible,
-                    "clickable": is_clickable
-                }
-            except Exception as e:
-                self.logger.warning(f"Error testing element {element}: {str(e)}")
-                continue
-
-        self.results['interactive_elements'] = interactive_results
-        return interactive_results
+        try:
+            interactive_elements = self.driver.execute_script(INTERACTIVE_ELEMENTS_SCRIPT)
+
+            interactive_results = [{
+                "name": f"{element['type']}_{element['id']}",
+                "visible": element['visible'],
+                "clickable": element['clickable']
+            } for element in interactive_elements]
+
+            self.results['interactive_elements'] = interactive_results
+            return interactive_results
+        except Exception as e:
+            self.logger.error(f"Error testing interactive elements: {str(e)}")
+            raise e
 
     def generate_report(self):
         """Generate a comprehensive report of all analysis results"""
@@ -137,22 +139,27 @@ class WebpageResponsivenessAnalyzer:
 
         return WebpageResponsivenessReport.from_dict(report)
 
-    def cleanup(self):
-        """Clean up resources"""
+    def cleanup(self, discard: bool = False):
+        """Clean up resources by handing the browser session back to the pool"""
         if hasattr(self, 'driver'):
-            self.driver.quit()
+            self.pool.release(self.driver, discard=discard)
+            del self.driver
 
     def run_full_analysis(self):
         """Run all analysis methods and generate report"""
+        completed = False
         try:
             self.start_analysis()
             self.check_load_time()
             self.check_viewport_sizes()
             self.check_resource_loading()
             self.check_interactive_elements()
-            return self.generate_report()
+            report = self.generate_report()
+            completed = True
+            return report
         finally:
-            self.cleanup()
+            # A session that failed mid-analysis may be in a bad state, so don't reuse it
+            self.cleanup(discard=not completed)
 
 # Usage example:
 # analyzer = WebpageResponsivenessAnalyzer("https://example.com")
@@ -0,0 +1,49 @@
+import threading
+
+from cachetools import TTLCache
+
+from services.validators import validate_url
+
+# Enough for a dashboard's worth of URLs; results older than the TTL are analyzed again
+RESULT_CACHE_SIZE = 512
+RESULT_CACHE_TTL = 300  # seconds
+
+
+class ResultCache:
+    """
+    Short-lived cache of analysis results keyed by normalized URL.
+
+    Keys go through validate_url and lose any trailing slash, so that e.g. 'example.com' and
+    'http://example.com/' share an entry.
+    TTLCache is not thread-safe on its own. The async endpoints in main.py call the analyzers on
+    the event loop today, but every access holds the lock so the cache stays safe if they are ever
+    run from threads.
+    """
+
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        try:
+            return validate_url(url).rstrip('/')
+        except ValueError:
+            return url
+
+    def get(self, url: str):
+        """Return the cached result for url, or None if there is no fresh entry"""
+        key = self._key(url)
+        with self._lock:
+            return self._cache.get(key)
+
+    def set(self, url: str, result) -> None:
+        """Store the result of analyzing url"""
+        key = self._key(url)
+        with self._lock:
+            self._cache[key] = result
+
+    def clear(self) -> None:
+        """Drop every cached result"""
+        with self._lock:
+            self._cache.clear()
@@ -1,8 +1,12 @@
 import re
 from datetime import datetime
+from functools import lru_cache
 from urllib.parse import urlparse
 
+SCHEME_PATTERN = re.compile(r'^https?://')
 
+
+@lru_cache(maxsize=1024)
 def validate_url(url: str) -> str:
     """
     Validate and normalize input URL
@@ -21,7 +25,7 @@ def validate_url(url: str) -> str:
         raise ValueError("URL cannot be empty")
 
     # Add http:// if no scheme provided
-    if not re.match(r'^https?://', url):
+    if not SCHEME_PATTERN.match(url):
         url = f'http://{url}'
 
     # Parse and validate URL
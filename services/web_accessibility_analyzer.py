@@ -1,46 +1,98 @@
-from typing import Dict, List
+import re
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Any, Dict, List
 
-import requests
 from bs4 import BeautifulSoup
 
 from dtos.responses.accessibility_response import AccessibilityAnalysisResult
+from log_management.logging_config import accessibility_logger
+from services.http_client import REQUEST_TIMEOUT, SESSION
+from services.result_cache import ResultCache
 
+HEADING_TAGS = frozenset({'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+STYLED_TEXT_TAGS = frozenset({'p', 'span', 'div', 'a'})
+ARIA_REFERENCE_ATTRIBUTES = ('aria-describedby', 'aria-labelledby')
+COLOR_STYLE_PATTERN = re.compile('color', re.IGNORECASE)
+
+# Only the markup is analyzed, so ask for HTML rather than whatever the server prefers to send
+PAGE_REQUEST_HEADERS = {'Accept': 'text/html,application/xhtml+xml;q=0.9'}
+
+# Recent results shared by every WebAccessibilityAnalyzer, so repeated requests for a URL skip the fetch
+accessibility_cache = ResultCache()
 
 class WebAccessibilityAnalyzer:
-    def __init__(self, url: str):
+    # Required ARIA attributes for specific roles
+    _REQUIRED_ARIA = MappingProxyType({
+        'checkbox': ('aria-checked',),
+        'combobox': ('aria-expanded',),
+        'slider': ('aria-valuenow', 'aria-valuemin', 'aria-valuemax'),
+        'progressbar': ('aria-valuenow', 'aria-valuemin', 'aria-valuemax'),
+        'scrollbar': ('aria-controls', 'aria-valuenow', 'aria-valuemin', 'aria-valuemax'),
+        'spinbutton': ('aria-valuenow', 'aria-valuemin', 'aria-valuemax'),
+        'textbox': ('aria-multiline',),
+    })
+
+    def __init__(self, url: str, cache: ResultCache = None):
         self.url = url
+        self.cache = cache or accessibility_cache
+        self.logger = accessibility_logger
         self.soup = None
         self.issues = []
-
-        # Define required ARIA attributes for specific roles
-        self.required_aria = {
-            'checkbox': ['aria-checked'],
-            'combobox': ['aria-expanded'],
-            'slider': ['aria-valuenow', 'aria-valuemin', 'aria-valuemax'],
-            'progressbar': ['aria-valuenow', 'aria-valuemin', 'aria-valuemax'],
-            'scrollbar': ['aria-controls', 'aria-valuenow', 'aria-valuemin', 'aria-valuemax'],
-            'spinbutton': ['aria-valuenow', 'aria-valuemin', 'aria-valuemax'],
-            'textbox': ['aria-multiline'],
-        }
+        self._element_index = None
 
     def load_page(self) -> bool:
         """Loads the webpage and creates BeautifulSoup object"""
         print(f"Loading page: {self.url}")
         try:
-            response = requests.get(self.url)
+            response = SESSION.get(self.url, headers=PAGE_REQUEST_HEADERS, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            self.soup = BeautifulSoup(response.text, 'html.parser')
+            # Hand lxml the raw bytes so it can sniff the encoding itself
+            self.soup = BeautifulSoup(response.content, 'lxml')
             return True
         except Exception as e:
             self.issues.append(f"Error loading page: {str(e)}")
             return False
 
+    def _index_elements(self) -> Dict[str, Any]:
+        """Buckets every element the checks look at in a single walk of the parsed page"""
+        if self._element_index is not None and self._element_index[0] is self.soup:
+            return self._element_index[1]
+
+        index = defaultdict(list, label_targets=set(), ids=set())
+        for element in self.soup.find_all(True):
+            name = element.name
+            if name == 'img':
+                index['images'].append(element)
+            elif name in HEADING_TAGS:
+                index['headings'].append(element)
+            elif name == 'input':
+                index['inputs'].append(element)
+            elif name == 'label' and element.get('for') is not None:
+                index['label_targets'].add(element.get('for'))
+
+            attrs = element.attrs
+            if name in STYLED_TEXT_TAGS and 'style' in attrs and COLOR_STYLE_PATTERN.search(attrs['style']):
+                index['colored_text'].append(element)
+            if 'id' in attrs:
+                index['ids'].add(attrs['id'])
+            if 'role' in attrs:
+                index['role'].append(element)
+            if 'aria-label' in attrs:
+                index['aria-label'].append(element)
+            for attribute in ARIA_REFERENCE_ATTRIBUTES:
+                if attribute in attrs:
+                    index[attribute].append(element)
+
+        self._element_index = (self.soup, index)
+        return index
+
     def check_images_alt(self) -> List[Dict]:
         """Checks for images without alt text"""
         print("Checking images for missing alt text")
         img_issues = []
         if self.soup:
-            images = self.soup.find_all('img')
+            images = self._index_elements()['images']
             print(f"Found {len(images)} images")
             for img in images:
                 if not img.get('alt'):
@@ -57,7 +109,7 @@ class WebAccessibilityAnalyzer:
         print("Checking heading hierarchy")
         heading_issues = []
         if self.soup:
-            headings = self.soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+            headings = self._index_elements()['headings']
             current_level = 0
             for heading in headings:
                 level = int(heading.name[1])
@@ -76,12 +128,12 @@ class WebAccessibilityAnalyzer:
         print("Checking form labels")
         form_issues = []
         if self.soup:
-            inputs = self.soup.find_all('input')
-            for input_elem in inputs:
+            index = self._index_elements()
+            label_targets = index['label_targets']
+            for input_elem in index['inputs']:
                 input_id = input_elem.get('id')
                 if input_id:
-                    label = self.soup.find('label', {'for': input_id})
-                    if not label:
+                    if input_id not in label_targets:
                         form_issues.append({
                             'element': 'input',
                             'type': input_elem.get('type', 'unknown'),
@@ -96,15 +148,13 @@ class WebAccessibilityAnalyzer:
         print("Checking color contrast")
         contrast_issues = []
         if self.soup:
-            elements = self.soup.find_all(['p', 'span', 'div', 'a'])
-            for elem in elements:
-                style = elem.get('style', '')
-                if 'color' in style.lower():
-                    contrast_issues.append({
-                        'element': elem.name,
-                        'text': elem.text.strip()[:50],
-                        'issue': 'Potential color contrast issue'
-                    })
+            # The index only holds text elements whose inline style sets a colour
+            for elem in self._index_elements()['colored_text']:
+                contrast_issues.append({
+                    'element': elem.name,
+                    'text': elem.text.strip()[:50],
+                    'issue': 'Potential color contrast issue'
+                })
         print(f"Found {len(contrast_issues)} potential color contrast issues")
         return contrast_issues
 
@@ -123,24 +173,26 @@ class WebAccessibilityAnalyzer:
     def _check_required_aria_attributes(self) -> List[Dict]:
         """Checks for missing required ARIA attributes"""
         issues = []
-        elements_with_role = self.soup.find_all(attrs={'role': True})
+        elements_with_role = self._index_elements()['role']
         for element in elements_with_role:
             role = element.get('role')
-            if role in self.required_aria:
-                missing_attrs = [attr for attr in self.required_aria[role] if not element.get(attr)]
-                if missing_attrs:
-                    issues.append({
-                        'element': element.name,
-                        'role': role,
-                        'missing_attributes': missing_attrs,
-                        'issue': f'Missing required ARIA attributes: {", ".join(missing_attrs)}'
-                    })
+            required_attrs = self._REQUIRED_ARIA.get(role)
+            if required_attrs is None:
+                continue
+            missing_attrs = [attr for attr in required_attrs if not element.get(attr)]
+            if missing_attrs:
+                issues.append({
+                    'element': element.name,
+                    'role': role,
+                    'missing_attributes': missing_attrs,
+                    'issue': f'Missing required ARIA attributes: {", ".join(missing_attrs)}'
+                })
         return issues
 
     def _check_empty_aria_labels(self) -> List[Dict]:
         """Checks for empty aria-label attributes"""
         issues = []
-        elements_with_arialabel = self.soup.find_all(attrs={'aria-label': True})
+        elements_with_arialabel = self._index_elements()['aria-label']
         for element in elements_with_arialabel:
             if not element.get('aria-label').strip():
                 issues.append({
@@ -152,19 +204,32 @@ class WebAccessibilityAnalyzer:
     def _check_aria_references(self, attribute: str) -> List[Dict]:
         """Checks for invalid ARIA references"""
         issues = []
-        elements_with_attribute = self.soup.find_all(attrs={attribute: True})
+        index = self._index_elements()
+        elements_with_attribute = index[attribute]
+        known_ids = index['ids']
         for element in elements_with_attribute:
             ids = element.get(attribute).split()
             for id_ref in ids:
-                if not self.soup.find(id=id_ref):
+                if id_ref not in known_ids:
                     issues.append({
                         'element': element.name,
                         'issue': f'Invalid {attribute} reference: {id_ref}'
                     })
         return issues
 
-    def analyze(self) -> AccessibilityAnalysisResult | dict:
-        """Performs complete accessibility analysis"""
+    def analyze(self, force: bool = False) -> AccessibilityAnalysisResult | dict:
+        """
+        Performs complete accessibility analysis
+
+        Args:
+            force: Re-run the analysis even if a recent result is cached
+        """
+        if not force:
+            cached = self.cache.get(self.url)
+            if cached is not None:
+                self.logger.info("Using cached accessibility analysis for: %s", self.url)
+                return cached
+
         print(f"Analyzing accessibility for: {self.url}")
         if not self.load_page():
             print("Failed to load page")
@@ -191,4 +256,7 @@ class WebAccessibilityAnalyzer:
         print("Accessibility analysis complete")
         print(results)
 
-        return AccessibilityAnalysisResult.from_dict(results)
\ No newline at end of file
+        # Only successful analyses are cached; a page that failed to load is retried next time
+        analysis = AccessibilityAnalysisResult.from_dict(results)
+        self.cache.set(self.url, analysis)
+        return analysis
\ No newline at end of file
@@ -1,12 +1,32 @@
+from celery.signals import worker_process_init
+
 from log_management.log_management import LogManagement
 from main import celery
 
+# One LogManagement per worker process, shared by every task it runs
+_log_management = None
+
+
+@worker_process_init.connect
+def init_log_management(**_):
+    global _log_management
+    _log_management = LogManagement(log_dir='logs')
+
+
+def get_log_management() -> LogManagement:
+    """Return the worker's LogManagement, creating it if the process init signal never fired (e.g. solo pool)"""
+    if _log_management is None:
+        init_log_management()
+    return _log_management
+
+
 @celery.task(name='compress_log_files')
 def compress_old_log_files():
     """
     Compress log files older than 7 days
     """
-    log_management = LogManagement(log_dir='logs', compress_older_than=1)
+    log_management = get_log_management()
+    log_management.compress_older_than = 1
     try:
         log_management.compress_old_logs()
         return "Log files compressed successfully"
@@ -19,7 +39,8 @@ def aggregate_logs():
     """
     Aggregate logs into daily summaries
     """
-    log_management = LogManagement(log_dir='logs', aggregation_days=7)
+    log_management = get_log_management()
+    log_management.aggregation_days = 7
     try:
         log_management.aggregate_logs()
         return "Logs aggregated successfully"
@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import Mock, PropertyMock, call, patch
+
+from services.chrome_pool import DEFAULT_WINDOW_SIZE, ChromePool
+
+
+@pytest.fixture
+def pool():
+    return ChromePool(max_size=1)
+
+
+@pytest.fixture
+def mock_chrome():
+    with patch('selenium.webdriver.Chrome') as mock:
+        mock.return_value = Mock()
+        yield mock
+
+
+def test_options():
+    pool = ChromePool()
+    assert '--headless' in pool.options.arguments
+    assert '--disable-gpu' in pool.options.arguments
+    assert '--window-size=%d,%d' % DEFAULT_WINDOW_SIZE in pool.options.arguments
+
+
+def test_released_session_is_reused(pool, mock_chrome):
+    driver = pool.acquire()
+    pool.release(driver)
+
+    assert pool.acquire() is driver
+    mock_chrome.assert_called_once()
+
+
+def test_released_session_is_reset(pool, mock_chrome):
+    driver = pool.acquire()
+    pool.release(driver)
+
+    driver.get.assert_called_once_with('about:blank')
+    driver.set_window_size.assert_called_once_with(*DEFAULT_WINDOW_SIZE)
+    driver.execute_cdp_cmd.assert_has_calls([
+        call('Network.clearBrowserCache', {}),
+        call('Network.clearBrowserCookies', {}),
+    ])
+    driver.quit.assert_not_called()
+
+
+def test_session_that_fails_reset_is_quit(pool, mock_chrome):
+    driver = pool.acquire()
+    driver.get.side_effect = Exception("Chrome not reachable")
+    pool.release(driver)
+
+    driver.quit.assert_called_once()
+    assert pool._idle.empty()
+
+
+def test_discarded_session_is_quit(pool, mock_chrome):
+    driver = pool.acquire()
+    pool.release(driver, discard=True)
+
+    driver.quit.assert_called_once()
+    assert pool._idle.empty()
+
+
+def test_dead_pooled_session_is_replaced(pool):
+    dead_driver, fresh_driver = Mock(), Mock()
+    type(dead_driver).current_url = PropertyMock(side_effect=Exception("Chrome not reachable"))
+    pool._idle.put(dead_driver)
+
+    with patch('selenium.webdriver.Chrome', return_value=fresh_driver):
+        assert pool.acquire() is fresh_driver
+
+    dead_driver.quit.assert_called_once()
+
+
+def test_failed_launch_frees_its_slot(pool, mock_chrome):
+    mock_chrome.side_effect = Exception("Chrome failed to start")
+    with pytest.raises(Exception, match="Chrome failed to start"):
+        pool.acquire()
+
+    # max_size is 1, so this would block if the failed launch had kept the slot
+    mock_chrome.side_effect = None
+    assert pool.acquire() is mock_chrome.return_value
+
+
+def test_driver_context_discards_session_on_error(pool, mock_chrome):
+    with pytest.raises(ValueError):
+        with pool.driver() as driver:
+            raise ValueError
+
+    driver.quit.assert_called_once()
+    assert pool._idle.empty()
+
+
+def test_shutdown_quits_idle_sessions(pool, mock_chrome):
+    driver = pool.acquire()
+    pool.release(driver)
+
+    pool.shutdown()
+
+    driver.quit.assert_called_once()
+    assert pool._idle.empty()
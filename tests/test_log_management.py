@@ -0,0 +1,103 @@
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from log_management.log_management import SECONDS_PER_DAY, LogManagement
+
+# Old enough to be aggregated, and far enough from midnight that every file lands on the same UTC day
+OLD_MTIME = (int(time.time() // SECONDS_PER_DAY) - 10) * SECONDS_PER_DAY + SECONDS_PER_DAY // 2
+OLD_DATE = time.strftime("%Y-%m-%d", time.gmtime(OLD_MTIME))
+
+
+def _entry(timestamp, message):
+    return json.dumps({'timestamp': timestamp, 'message': message})
+
+
+def _write_log(path, lines, mtime=OLD_MTIME):
+    path.write_text(''.join(f'{line}\n' for line in lines))
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def _read_messages(path):
+    return [json.loads(line)['message'] for line in path.read_text().splitlines()]
+
+
+@pytest.fixture
+def log_management(tmp_path):
+    return LogManagement(str(tmp_path), aggregation_days=1)
+
+
+def test_aggregate_merges_files_in_timestamp_order(tmp_path, log_management):
+    _write_log(tmp_path / 'a.log', [
+        _entry('2024-01-01T00:00:01+00:00', 'a1'),
+        _entry('2024-01-01T00:00:03+00:00', 'a2'),
+    ])
+    _write_log(tmp_path / 'b.log', [
+        _entry('2024-01-01T00:00:02+00:00', 'b1'),
+        _entry('2024-01-01T00:00:04+00:00', 'b2'),
+    ])
+
+    log_management.aggregate_logs()
+
+    assert _read_messages(tmp_path / f'aggregate_{OLD_DATE}.ndjson') == ['a1', 'b1', 'a2', 'b2']
+
+
+@pytest.mark.parametrize("files", [1, 2])
+def test_aggregate_drops_lines_that_are_not_log_records(tmp_path, log_management, files):
+    noisy = ['', '   ', 'not json', '[1, 2, 3]', '"a string"', '{"broken": ']
+    _write_log(tmp_path / 'a.log', [_entry('2024-01-01T00:00:01+00:00', 'a1'), *noisy])
+    if files == 2:
+        _write_log(tmp_path / 'b.log', [*noisy, _entry('2024-01-01T00:00:02+00:00', 'b1')])
+
+    log_management.aggregate_logs()
+
+    expected = ['a1', 'b1'] if files == 2 else ['a1']
+    assert _read_messages(tmp_path / f'aggregate_{OLD_DATE}.ndjson') == expected
+
+
+def test_group_logs_by_date_skips_aggregates_compressed_and_recent_logs(tmp_path, log_management):
+    old_log = _write_log(tmp_path / 'a.log', [_entry('2024-01-01T00:00:01+00:00', 'a1')])
+    _write_log(tmp_path / 'aggregate_2024-01-01.ndjson', [_entry('2024-01-01T00:00:01+00:00', 'x')])
+    _write_log(tmp_path / 'old.log.gz', ['compressed'])
+    _write_log(tmp_path / 'recent.log', [_entry('2024-01-01T00:00:01+00:00', 'r')], mtime=time.time())
+
+    assert log_management.group_logs_by_date() == {OLD_DATE: [str(old_log)]}
+
+
+def test_failed_write_leaves_no_partial_aggregate(tmp_path, log_management):
+    original = _write_log(tmp_path / 'a.log', [_entry('2024-01-01T00:00:01+00:00', 'a1')])
+
+    def failing_lines(files):
+        yield _entry('2024-01-01T00:00:01+00:00', 'a1')
+        raise OSError("No space left on device")
+
+    with patch.object(log_management, 'combine_logs', side_effect=failing_lines):
+        log_management.aggregate_logs()
+
+    assert sorted(os.listdir(tmp_path)) == ['a.log']
+    assert _read_messages(original) == ['a1']
+
+
+def test_originals_are_removed_only_after_aggregate_is_written(tmp_path, log_management):
+    originals = [
+        _write_log(tmp_path / 'a.log', [_entry('2024-01-01T00:00:01+00:00', 'a1')]),
+        _write_log(tmp_path / 'b.log', [_entry('2024-01-01T00:00:02+00:00', 'b1')]),
+    ]
+    aggregate = tmp_path / f'aggregate_{OLD_DATE}.ndjson'
+    remove_original_files = log_management.remove_original_files
+
+    def check_aggregate_then_remove(files):
+        assert _read_messages(aggregate) == ['a1', 'b1']
+        remove_original_files(files)
+
+    with patch.object(log_management, 'remove_original_files', side_effect=check_aggregate_then_remove) as mock_remove:
+        log_management.aggregate_logs()
+
+    mock_remove.assert_called_once()
+    assert sorted(mock_remove.call_args.args[0]) == sorted(map(str, originals))
+    assert not any(path.exists() for path in originals)
+    assert not list(tmp_path.glob('*.tmp'))
@@ -0,0 +1,95 @@
+import atexit
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from log_management import logging_config
+from log_management.logging_config import setup_logger
+
+
+def _stop_listener(name):
+    """Stop a logger's listener the way atexit would, so every queued record reaches its handlers"""
+    listener = logging_config._queue_listeners.pop(name)
+    atexit.unregister(listener.stop)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+def _read_records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.fixture
+def logger_name(request):
+    name = f'test_logging_config.{request.node.name}'
+    yield name
+    if name in logging_config._queue_listeners:
+        _stop_listener(name)
+
+
+def test_record_with_extra_and_exc_info_reaches_file(tmp_path, logger_name):
+    log_file = tmp_path / 'test.log'
+    logger = setup_logger(logger_name, str(log_file))
+
+    try:
+        raise ValueError("bad value")
+    except ValueError:
+        logger.error("Something failed", exc_info=True, extra={'user_id': 42, 'api_key': 'abc123'})
+    _stop_listener(logger_name)
+
+    [record] = _read_records(log_file)
+    assert record['message'] == "Something failed"
+    assert record['level'] == 'ERROR'
+    assert record['user_id'] == 42
+    assert record['api_key'] == '[REDACTED]'
+    assert record['exception']['type'] == 'ValueError'
+    assert record['exception']['message'] == 'bad value'
+    assert 'raise ValueError("bad value")' in ''.join(record['exception']['traceback'])
+
+
+def test_reattaching_stops_and_closes_previous_listener(tmp_path, logger_name):
+    setup_logger(logger_name, str(tmp_path / 'first.log'))
+    old_listener = logging_config._queue_listeners[logger_name]
+    [old_handler] = old_listener.handlers
+
+    with patch.object(atexit, 'unregister', wraps=atexit.unregister) as mock_unregister:
+        logger = setup_logger(logger_name, str(tmp_path / 'second.log'))
+
+    mock_unregister.assert_called_once_with(old_listener.stop)
+    assert old_listener._thread is None
+    assert old_handler.stream is None
+    assert logging_config._queue_listeners[logger_name] is not old_listener
+    assert len(logger.handlers) == 1
+
+    logger.warning("After reattach")
+    _stop_listener(logger_name)
+    assert (tmp_path / 'first.log').read_text() == ''
+    assert [r['message'] for r in _read_records(tmp_path / 'second.log')] == ["After reattach"]
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="requires os.fork")
+def test_forked_child_writes_its_records(tmp_path, logger_name):
+    log_file = tmp_path / 'test.log'
+    logger = setup_logger(logger_name, str(log_file))
+    logger.info("From parent")
+
+    pid = os.fork()
+    if pid == 0:
+        # Never return into pytest from the child, whatever happens
+        status = 1
+        try:
+            logger.info("From child")
+            _stop_listener(logger_name)
+            status = 0
+        finally:
+            os._exit(status)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+    _stop_listener(logger_name)
+    messages = [r['message'] for r in _read_records(log_file)]
+    assert sorted(messages) == ["From child", "From parent"]
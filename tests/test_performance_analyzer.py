@@ -1,34 +1,37 @@
 import pytest
 from unittest.mock import Mock, patch
 
+from services.chrome_pool import ChromePool
+from services.http_client import REQUEST_TIMEOUT
+from services.result_cache import ResultCache
 from services.performance_analyzer import WebPageAnalyzer, GOOD, NEEDS_IMPROVEMENT, POOR
 
 
 @pytest.fixture
 def analyzer():
-    return WebPageAnalyzer()
+    return WebPageAnalyzer(pool=ChromePool(), cache=ResultCache())
 
 
 @pytest.fixture
 def mock_driver():
     with patch('selenium.webdriver.Chrome') as mock:
         driver_instance = Mock()
+        driver_instance.execute_cdp_cmd.return_value = {'identifier': '1'}
         mock.return_value = driver_instance
         yield driver_instance
 
 
 @pytest.fixture
 def mock_requests():
-    with patch('requests.get') as mock:
+    with patch('services.performance_analyzer.TIMING_SESSION.get') as mock:
         yield mock
 
 
 class TestWebPageAnalyzer:
     def test_init(self):
-        analyzer = WebPageAnalyzer()
+        analyzer = WebPageAnalyzer(pool=ChromePool())
         assert analyzer.metrics == {}
-        assert '--headless' in analyzer.chrome_options.arguments
-        assert '--disable-gpu' in analyzer.chrome_options.arguments
+        assert isinstance(analyzer.pool, ChromePool)
 
     def test_measure_ttfb(self, analyzer, mock_requests):
         with patch('time.time') as mock_time:
@@ -36,32 +39,53 @@ class TestWebPageAnalyzer:
             analyzer.measure_ttfb('https://example.com')
 
         assert analyzer.metrics['TTFB'] == 1000.0  # 1 second = 1000ms
-        mock_requests.assert_called_once_with('https://example.com')
+        mock_requests.assert_called_once_with('https://example.com', stream=True, timeout=REQUEST_TIMEOUT)
+        mock_requests.return_value.close.assert_called_once()
 
     def test_measure_fcp_lcp(self, analyzer, mock_driver):
-        mock_driver.execute_script.return_value = {'FCP': 1500, 'LCP': 2000}
+        mock_driver.execute_async_script.return_value = {'FCP': 1500, 'LCP': 2000}
 
         analyzer.measure_fcp_lcp('https://example.com')
 
         assert analyzer.metrics['FCP'] == 1500.0
         assert analyzer.metrics['LCP'] == 2000.0
-        mock_driver.quit.assert_called_once()
+        mock_driver.quit.assert_not_called()
 
     def test_measure_cls(self, analyzer, mock_driver):
-        mock_driver.execute_script.return_value = 0.15
+        mock_driver.execute_async_script.return_value = {'CLS': 0.15}
 
         analyzer.measure_cls('https://example.com')
 
         assert analyzer.metrics['CLS'] == 0.15
-        mock_driver.quit.assert_called_once()
+        mock_driver.quit.assert_not_called()
 
     def test_measure_fid(self, analyzer, mock_driver):
-        mock_driver.execute_script.return_value = 50
+        mock_driver.execute_async_script.return_value = {'FID': 50}
 
         analyzer.measure_fid('https://example.com')
 
         assert analyzer.metrics['FID'] == 50.0
-        mock_driver.quit.assert_called_once()
+        mock_driver.quit.assert_not_called()
+
+    def test_web_vitals_share_one_browser_session(self, analyzer, mock_driver):
+        mock_driver.execute_async_script.return_value = {'FCP': 1500, 'LCP': 2000, 'CLS': 0.05, 'FID': 50}
+
+        analyzer.measure_fcp_lcp('https://example.com')
+        analyzer.measure_cls('https://example.com')
+        analyzer.measure_fid('https://example.com')
+
+        assert analyzer.metrics == {'FCP': 1500.0, 'LCP': 2000.0, 'CLS': 0.05, 'FID': 50.0}
+        mock_driver.get.assert_any_call('https://example.com')
+        mock_driver.execute_async_script.assert_called_once()
+        mock_driver.quit.assert_not_called()
+
+    def test_observer_script_is_removed_before_session_returns_to_pool(self, analyzer, mock_driver):
+        mock_driver.execute_async_script.return_value = {'FCP': 1500}
+
+        analyzer.collect_web_vitals('https://example.com')
+
+        mock_driver.execute_cdp_cmd.assert_any_call('Page.removeScriptToEvaluateOnNewDocument', {'identifier': '1'})
+        assert analyzer.pool._idle.get_nowait() is mock_driver
 
     def test_analyze_adds_https(self, analyzer):
         analyzer.metrics = {
@@ -83,6 +107,33 @@ class TestWebPageAnalyzer:
             mock_cls.assert_called_once_with(expected_url)
             mock_fid.assert_called_once_with(expected_url)
 
+    def test_analyze_uses_cached_result(self, analyzer):
+        analyzer.metrics = {'TTFB': 500, 'FCP': 1500, 'LCP': 2000, 'CLS': 0.05, 'FID': 50}
+        with patch.object(analyzer, 'measure_ttfb') as mock_ttfb, \
+                patch.object(analyzer, 'measure_fcp_lcp'), \
+                patch.object(analyzer, 'measure_cls'), \
+                patch.object(analyzer, 'measure_fid'):
+            first = analyzer.analyze('example.com')
+            assert analyzer.analyze('https://example.com/') is first
+            mock_ttfb.assert_called_once()
+
+            analyzer.analyze('example.com', force=True)
+            assert mock_ttfb.call_count == 2
+
+    def test_forced_analysis_takes_new_browser_measurement(self, analyzer, mock_driver, mock_requests):
+        mock_driver.execute_async_script.side_effect = [
+            {'FCP': 100, 'LCP': 200, 'CLS': 0.01, 'FID': 10},
+            {'FCP': 9999, 'LCP': 9999, 'CLS': 0.5, 'FID': 500},
+        ]
+
+        first = analyzer.analyze('https://example.com')
+        forced = analyzer.analyze('https://example.com', force=True)
+
+        assert first.FCP.value == 100
+        assert forced.FCP.value == 9999
+        assert forced.CLS.rating == POOR
+        assert mock_driver.execute_async_script.call_count == 2
+
     @pytest.mark.parametrize("metric_values,expected_ratings", [
         (
                 {'TTFB': 500, 'FCP': 1500, 'LCP': 2000, 'CLS': 0.05, 'FID': 50},
@@ -97,6 +148,11 @@ class TestWebPageAnalyzer:
                 {'TTFB': 2000, 'FCP': 3500, 'LCP': 4500, 'CLS': 0.3, 'FID': 350},
                 {'TTFB': POOR, 'FCP': POOR, 'LCP': POOR, 'CLS': POOR, 'FID': POOR}
         ),
+        (
+                {'TTFB': 800, 'FCP': 3000, 'LCP': 2500, 'CLS': 0.25, 'FID': 100},
+                {'TTFB': NEEDS_IMPROVEMENT, 'FCP': POOR, 'LCP': NEEDS_IMPROVEMENT,
+                 'CLS': POOR, 'FID': NEEDS_IMPROVEMENT}
+        ),
     ])
     def test_get_results_ratings(self, analyzer, metric_values, expected_ratings):
         analyzer.metrics = metric_values
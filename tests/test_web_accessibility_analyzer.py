@@ -3,68 +3,215 @@ from unittest.mock import Mock, patch
 import requests
 from bs4 import BeautifulSoup
 
-from services.web_accessibility_analyzer import WebAccessibilityAnalyzer
+from services.http_client import REQUEST_TIMEOUT
+from services.result_cache import ResultCache
+from services.web_accessibility_analyzer import PAGE_REQUEST_HEADERS, WebAccessibilityAnalyzer
+
+
+def _soup(html: str) -> BeautifulSoup:
+    """Parse test markup with the same parser load_page uses"""
+    return BeautifulSoup(html, 'lxml')
+
+
+IMAGES_HTML = """
+<html>
+    <body>
+        <img src="image1.jpg">
+        <img src="image2.jpg" alt="">
+        <img src="image3.jpg" alt="Description">
+    </body>
+</html>
+"""
+
+HEADINGS_HTML = """
+<html>
+    <body>
+        <h1>Main Heading</h1>
+        <h3>Skipped Heading</h3>
+        <h2>Correct Hierarchy</h2>
+    </body>
+</html>
+"""
+
+FORM_HTML = """
+<html>
+    <body>
+        <input type="text" id="username">
+        <label for="email">Email</label>
+        <input type="email" id="email">
+    </body>
+</html>
+"""
+
+CONTRAST_HTML = """
+<html>
+    <body>
+        <p style="color: #000;">Dark text</p>
+        <div style="color: red;">Colored div</div>
+        <span>No color</span>
+    </body>
+</html>
+"""
+
+ARIA_HTML = """
+<html>
+    <body>
+        <div role="checkbox"></div>
+        <input role="slider">
+        <div aria-label=""></div>
+        <div aria-describedby="nonexistent-id">Content</div>
+    </body>
+</html>
+"""
+
+ARIA_REFERENCES_HTML = """
+<html>
+    <body>
+        <p id="hint">Hint</p>
+        <input aria-describedby="hint missing-id">
+        <div aria-labelledby="hint">Content</div>
+    </body>
+</html>
+"""
+
+ANALYZE_HTML = b"""
+<html>
+    <body>
+        <img src="test.jpg">
+        <h1>Title</h1>
+        <input type="text" id="username">
+    </body>
+</html>
+"""
+
+
+# Parsed once per module; none of the checks mutate the soup, so tests share the trees
+@pytest.fixture(scope="module")
+def images_soup():
+    return _soup(IMAGES_HTML)
+
+
+@pytest.fixture(scope="module")
+def headings_soup():
+    return _soup(HEADINGS_HTML)
+
+
+@pytest.fixture(scope="module")
+def form_soup():
+    return _soup(FORM_HTML)
+
+
+@pytest.fixture(scope="module")
+def contrast_soup():
+    return _soup(CONTRAST_HTML)
+
+
+@pytest.fixture(scope="module")
+def aria_soup():
+    return _soup(ARIA_HTML)
+
+
+@pytest.fixture(scope="module")
+def aria_references_soup():
+    return _soup(ARIA_REFERENCES_HTML)
+
+
+def _respond_with(content: bytes):
+    """Make the mocked request return a successful response with the given body"""
+    def setup(mock_get):
+        mock_response = Mock()
+        mock_response.content = content
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+    return setup
+
+
+def _fail_with(error: Exception):
+    """Make the mocked request raise the given error"""
+    def setup(mock_get):
+        mock_get.side_effect = error
+    return setup
+
+
+def _check_page_loaded(analyzer, result):
+    assert result is True
+    assert analyzer.soup is not None
+    assert isinstance(analyzer.soup, BeautifulSoup)
+
+
+def _check_page_not_loaded(analyzer, result):
+    assert result is False
+    assert analyzer.soup is None
+    assert len(analyzer.issues) == 1
+    assert "Error loading page" in analyzer.issues[0]
+
+
+def _check_analysis_found_issues(analyzer, result):
+    result_dict = dict(result)
+    assert result is not None
+    assert 'url' in result_dict
+    assert 'total_issues' in result_dict
+    assert result_dict['total_issues'] > 0
 
 
-@pytest.fixture
+def _check_analysis_failed(analyzer, result):
+    assert 'error' in result
+    assert result['error'] == 'Failed to load page'
+
+
+CONNECTION_ERROR = requests.RequestException("Connection error")
+
+LOAD_CASES = [
+    pytest.param(_respond_with(b"<html><body>Test Page</body></html>"), _check_page_loaded, id="success"),
+    pytest.param(_fail_with(CONNECTION_ERROR), _check_page_not_loaded, id="failure"),
+]
+
+ANALYZE_CASES = [
+    pytest.param(_respond_with(ANALYZE_HTML), _check_analysis_found_issues, id="success"),
+    pytest.param(_fail_with(CONNECTION_ERROR), _check_analysis_failed, id="load_failure"),
+]
+
+
+@pytest.fixture(scope="module")
 def mock_requests_get():
     """Mock requests.get to simulate web page responses"""
-    with patch('requests.get') as mock_get:
+    with patch('services.web_accessibility_analyzer.SESSION.get') as mock_get:
         yield mock_get
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def analyzer():
     """Create a WebAccessibilityAnalyzer instance"""
-    return WebAccessibilityAnalyzer("https://example.com")
+    return WebAccessibilityAnalyzer("https://example.com", cache=ResultCache())
 
 
-def test_load_page_success(analyzer, mock_requests_get):
-    """Test successful page loading"""
-    # Create a mock response
-    mock_response = Mock()
-    mock_response.text = "<html><body>Test Page</body></html>"
-    mock_response.raise_for_status = Mock()
-    mock_requests_get.return_value = mock_response
+@pytest.fixture(autouse=True)
+def _reset_analyzer(analyzer, mock_requests_get):
+    """Give every test a clean analyzer and request mock, since both are shared across the module"""
+    analyzer.issues.clear()
+    analyzer.soup = None
+    analyzer.cache.clear()
+    mock_requests_get.reset_mock(return_value=True, side_effect=True)
 
-    # Call load_page
-    result = analyzer.load_page()
 
-    # Assertions
-    assert result is True
-    assert analyzer.soup is not None
-    assert isinstance(analyzer.soup, BeautifulSoup)
-    mock_requests_get.assert_called_once_with("https://example.com")
-
-
-def test_load_page_failure(analyzer, mock_requests_get):
-    """Test page loading failure"""
-    # Simulate a request exception
-    mock_requests_get.side_effect = requests.RequestException("Connection error")
+@pytest.mark.parametrize("setup,check", LOAD_CASES)
+def test_load_page(analyzer, mock_requests_get, setup, check):
+    """Test page loading for a successful response and a failed request"""
+    setup(mock_requests_get)
 
     # Call load_page
     result = analyzer.load_page()
 
     # Assertions
-    assert result is False
-    assert analyzer.soup is None
-    assert len(analyzer.issues) == 1
-    assert "Error loading page" in analyzer.issues[0]
+    check(analyzer, result)
+    mock_requests_get.assert_called_once_with(
+        "https://example.com", headers=PAGE_REQUEST_HEADERS, timeout=REQUEST_TIMEOUT
+    )
 
 
-def test_check_images_alt(analyzer):
+def test_check_images_alt(analyzer, images_soup):
     """Test checking images for missing alt text"""
-    # Create a mock BeautifulSoup object with test images
-    html_content = """
-    <html>
-        <body>
-            <img src="image1.jpg">
-            <img src="image2.jpg" alt="">
-            <img src="image3.jpg" alt="Description">
-        </body>
-    </html>
-    """
-    analyzer.soup = BeautifulSoup(html_content, 'html.parser')
+    analyzer.soup = images_soup
 
     # Call the method
     issues = analyzer.check_images_alt()
@@ -76,19 +223,9 @@ def test_check_images_alt(analyzer):
     assert issues[0]['issue'] == 'Missing alt text'
 
 
-def test_check_heading_hierarchy(analyzer):
+def test_check_heading_hierarchy(analyzer, headings_soup):
     """Test checking heading hierarchy"""
-    # Create a mock BeautifulSoup object with test headings
-    html_content = """
-    <html>
-        <body>
-            <h1>Main Heading</h1>
-            <h3>Skipped Heading</h3>
-            <h2>Correct Hierarchy</h2>
-        </body>
-    </html>
-    """
-    analyzer.soup = BeautifulSoup(html_content, 'html.parser')
+    analyzer.soup = headings_soup
 
     # Call the method
     issues = analyzer.check_heading_hierarchy()
@@ -99,19 +236,9 @@ def test_check_heading_hierarchy(analyzer):
     assert 'Skipped heading level' in issues[0]['issue']
 
 
-def test_check_form_labels(analyzer):
+def test_check_form_labels(analyzer, form_soup):
     """Test checking form inputs for associated labels"""
-    # Create a mock BeautifulSoup object with test form inputs
-    html_content = """
-    <html>
-        <body>
-            <input type="text" id="username">
-            <label for="email">Email</label>
-            <input type="email" id="email">
-        </body>
-    </html>
-    """
-    analyzer.soup = BeautifulSoup(html_content, 'html.parser')
+    analyzer.soup = form_soup
 
     # Call the method
     issues = analyzer.check_form_labels()
@@ -123,19 +250,9 @@ def test_check_form_labels(analyzer):
     assert issues[0]['issue'] == 'Missing associated label'
 
 
-def test_check_color_contrast(analyzer):
+def test_check_color_contrast(analyzer, contrast_soup):
     """Test checking color contrast"""
-    # Create a mock BeautifulSoup object with test elements
-    html_content = """
-    <html>
-        <body>
-            <p style="color: #000;">Dark text</p>
-            <div style="color: red;">Colored div</div>
-            <span>No color</span>
-        </body>
-    </html>
-    """
-    analyzer.soup = BeautifulSoup(html_content, 'html.parser')
+    analyzer.soup = contrast_soup
 
     # Call the method
     issues = analyzer.check_color_contrast()
@@ -145,20 +262,9 @@ def test_check_color_contrast(analyzer):
     assert all('potential color contrast issue' in issue['issue'].lower() for issue in issues)
 
 
-def test_check_aria_attributes(analyzer):
+def test_check_aria_attributes(analyzer, aria_soup):
     """Test checking ARIA attributes"""
-    # Create a mock BeautifulSoup object with test ARIA elements
-    html_content = """
-    <html>
-        <body>
-            <div role="checkbox"></div>
-            <input role="slider">
-            <div aria-label=""></div>
-            <div aria-describedby="nonexistent-id">Content</div>
-        </body>
-    </html>
-    """
-    analyzer.soup = BeautifulSoup(html_content, 'html.parser')
+    analyzer.soup = aria_soup
 
     # Call the method
     issues = analyzer.check_aria_attributes()
@@ -167,41 +273,43 @@ def test_check_aria_attributes(analyzer):
     assert len(issues) >= 3  # Should have multiple ARIA issues
 
 
-def test_analyze_success(analyzer, mock_requests_get):
-    """Test full accessibility analysis success"""
-    # Mock requests and BeautifulSoup
-    mock_response = Mock()
-    mock_response.text = """
-    <html>
-        <body>
-            <img src="test.jpg">
-            <h1>Title</h1>
-            <input type="text" id="username">
-        </body>
-    </html>
-    """
-    mock_response.raise_for_status = Mock()
-    mock_requests_get.return_value = mock_response
+def test_check_aria_references(analyzer, aria_references_soup):
+    """Test that only references to missing ids are reported"""
+    analyzer.soup = aria_references_soup
 
-    # Call analyze method
-    result = analyzer.analyze()
-    result_dict = dict(result)
+    # Call the method
+    issues = analyzer.check_aria_attributes()
 
     # Assertions
-    assert result is not None
-    assert 'url' in result_dict
-    assert 'total_issues' in result_dict
-    assert result_dict['total_issues'] > 0
+    assert issues == [{'element': 'input', 'issue': 'Invalid aria-describedby reference: missing-id'}]
 
 
-def test_analyze_load_failure(analyzer, mock_requests_get):
-    """Test accessibility analysis with page load failure"""
-    # Simulate a request exception
-    mock_requests_get.side_effect = requests.RequestException("Connection error")
+@pytest.mark.parametrize("setup,check", ANALYZE_CASES)
+def test_analyze(analyzer, mock_requests_get, setup, check):
+    """Test full accessibility analysis for a loadable page and a page load failure"""
+    setup(mock_requests_get)
 
     # Call analyze method
     result = analyzer.analyze()
 
     # Assertions
-    assert 'error' in result
-    assert result['error'] == 'Failed to load page'
+    check(analyzer, result)
+
+
+def test_analyze_uses_cached_result(mock_requests_get):
+    """Test a repeated analysis is served from the cache unless forced"""
+    mock_response = Mock()
+    mock_response.content = b"<html><body><img src='test.jpg'></body></html>"
+    mock_response.raise_for_status = Mock()
+    mock_requests_get.return_value = mock_response
+    analyzer = WebAccessibilityAnalyzer("example.com", cache=ResultCache())
+
+    first = analyzer.analyze()
+    again = WebAccessibilityAnalyzer("http://example.com/", cache=analyzer.cache).analyze()
+    assert again is first
+    mock_requests_get.assert_called_once()
+
+    forced = analyzer.analyze(force=True)
+    assert forced is not first
+    assert mock_requests_get.call_count == 2
+